@@ -0,0 +1,282 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# ------------------------------
+# CONSTANTES ET CONFIGURATION
+# ------------------------------
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+VERSION_PATTERN = re.compile(r"^CheckScriptV(\d+(?:\.\d+)*)\.py$")
+# Fichiers annexes copiés à côté de chaque version lorsqu'ils existent
+SIDE_FILES = ("forbidden_folders.json",)
+LICENSES = {
+    "DEV": "IBNPSRV",
+    "PREPROD": "IBPRSRVI",
+    "PROD": "IBPRSRVI",
+}
+SERVERS = {
+    "DEV": "wezjwcxpadwv002.pwcglb.com",
+    "PREPROD": "wezjwcxpapwv001.pwcglb.com",
+    "PROD": "wezjwcxpapwv004.pwcglb.com",
+}
+MAGIC_FOLDERS = {"DEV": "MagicDev", "PREPROD": "MagicPPrd", "PROD": "MagicPrd"}
+# Noms de dossiers interdits : les anciennes versions ignorent tout fichier dont le chemin contient l'un d'eux
+FORBIDDEN_NAMES = ("Temp", "CleanBackUp", "DebuggerSave", "files", "Flow124")
+DEFAULT_WORK_DIR = os.path.join(SCRIPT_DIR, "bench_work")
+
+# ------------------------------
+# VERSIONS
+# ------------------------------
+def version_key(version):
+    """ Clé de tri numérique d'une version ("1.4.1" -> (1, 4, 1)). """
+    return tuple(int(part) for part in version.split("."))
+
+def find_versions(directory=SCRIPT_DIR):
+    """ Renvoie la liste triée des (version, chemin) des scripts CheckScriptV*.py. """
+    versions = []
+    for file_name in os.listdir(directory):
+        match = VERSION_PATTERN.match(file_name)
+        if match:
+            versions.append((match.group(1), os.path.join(directory, file_name)))
+    return sorted(versions, key=lambda item: version_key(item[0]))
+
+# ------------------------------
+# GÉNÉRATION DES ARBORESCENCES
+# ------------------------------
+def write_file(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+def generate_tree(base_dir, environment, projects=50, depth=3, files_per_dir=5, error_rate=0.2, seed=0):
+    """ Génère une arborescence de projets reproductible (même graine = même arborescence), avec des erreurs injectées. """
+    rng = random.Random(seed)
+    magic_env = MAGIC_FOLDERS[environment]
+    other_envs = [env for env in MAGIC_FOLDERS if env != environment]
+
+    write_file(os.path.join(base_dir, "ifs.ini"), f"[MAGIC_ENV]LicenseName={LICENSES[environment]}\n")
+    for index in range(projects):
+        project_dir = os.path.join(base_dir, f"PWC_Projet{index:04d}")
+
+        license_name = LICENSES[rng.choice(other_envs)] if rng.random() < error_rate else LICENSES[environment]
+        write_file(os.path.join(project_dir, "ifs.ini"), f"[MAGIC_ENV]LicenseName={license_name}\n")
+
+        env_folder = MAGIC_FOLDERS[rng.choice(other_envs)] if rng.random() < error_rate else magic_env
+        host = SERVERS[rng.choice(other_envs)] if rng.random() < error_rate else SERVERS[environment]
+        write_file(os.path.join(project_dir, "start.xml"),
+                   f'<Root><Project ProjectsDirPath="D:\\{env_folder}\\Projects"/>'
+                   f'<Server host="{host}" alternateHosts="{SERVERS[environment]}"/></Root>\n')
+
+        if rng.random() < error_rate:
+            write_file(os.path.join(project_dir, f"PWC_Projet{index:04d}.suo"))
+        if rng.random() < error_rate:
+            write_file(os.path.join(project_dir, "DebuggerSave", "save.dat"))
+            if rng.random() < 0.5:
+                write_file(os.path.join(project_dir, "Version.txt"), "1.0\n")
+        if rng.random() < error_rate:
+            write_file(os.path.join(project_dir, "Temp", "tmp.dat"))
+
+        # Sous-dossiers de remplissage pour donner du volume au parcours
+        current_dir = project_dir
+        for level in range(depth):
+            current_dir = os.path.join(current_dir, f"Source{level}")
+            for file_index in range(files_per_dir):
+                write_file(os.path.join(current_dir, f"Prg{file_index:03d}.xml"), "<Application/>\n")
+
+# ------------------------------
+# EXÉCUTION D'UNE VERSION
+# ------------------------------
+def read_findings(results_file):
+    """ Lit le fichier de résultats et renvoie l'ensemble des messages (sans horodatage ni niveau). """
+    findings = set()
+    if not os.path.exists(results_file):
+        return findings
+    with open(results_file, "r", encoding="utf-8", errors="ignore") as file:
+        for line in file:
+            # Format : AAAA-MM-JJ;HH:MM:SS.mmm;0;NIVEAU;message
+            parts = line.rstrip("\n").split(";", 4)
+            if len(parts) == 5 and parts[4] != "Résultats de l'analyse:":
+                findings.add(parts[4])
+    return findings
+
+def read_io_counters(pid):
+    """ Octets lus et écrits par le processus (rchar / wchar de /proc/<pid>/io, Linux uniquement), ou None.
+
+    Ce sont des lectures logiques : elles comptent aussi les fichiers servis par le cache des pages.
+    """
+    try:
+        with open(f"/proc/{pid}/io", "r", encoding="ascii") as file:
+            counters = dict(line.split(": ") for line in file.read().splitlines())
+        return {"read_bytes": int(counters["rchar"]), "write_bytes": int(counters["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def run_once(script_path, environment, tree_dir, extra_args=()):
+    """ Exécute un script dans un sous-processus et mesure le temps, la mémoire maximale et les E/S. """
+    command = [sys.executable, script_path, environment, "--folder", tree_dir, *extra_args]
+    stderr_path = os.path.join(os.path.dirname(script_path), "stderr.txt")
+    with open(stderr_path, "w", encoding="utf-8") as stderr_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        io_counters = None
+        if hasattr(os, "wait4"):
+            # Attente de la fin sans libérer le processus : ses compteurs d'E/S restent lisibles
+            if hasattr(os, "waitid"):
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+                io_counters = read_io_counters(process.pid)
+            # wait4 donne l'usage des ressources de ce processus seul (Unix uniquement)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            usage = None
+            process.wait()
+    elapsed = time.perf_counter() - start
+
+    measure = {"seconds": elapsed, "returncode": process.returncode}
+    if usage is not None:
+        # ru_maxrss est en Ko sous Linux et en octets sous macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        measure["max_rss_bytes"] = usage.ru_maxrss * scale
+    if io_counters is not None:
+        measure.update(io_counters)
+    if process.returncode != 0:
+        with open(stderr_path, "r", encoding="utf-8", errors="ignore") as stderr_file:
+            measure["stderr"] = stderr_file.read().strip().splitlines()[-1:]
+    return measure
+
+def run_version(version, script_path, environment, tree_dir, repeat, work_dir, extra_args=()):
+    """ Exécute une version isolée dans son propre dossier (logs et résultats séparés) et agrège les mesures. """
+    version_dir = os.path.join(work_dir, f"V{version}")
+    os.makedirs(version_dir, exist_ok=True)
+    local_script = os.path.join(version_dir, os.path.basename(script_path))
+    shutil.copy2(script_path, local_script)
+    for side_file in SIDE_FILES:
+        side_path = os.path.join(os.path.dirname(script_path), side_file)
+        if os.path.exists(side_path):
+            shutil.copy2(side_path, version_dir)
+
+    measures = [run_once(local_script, environment, tree_dir, extra_args) for _ in range(repeat)]
+    findings = read_findings(os.path.join(version_dir, "resultats", "Checks_Results.txt"))
+    seconds = [measure["seconds"] for measure in measures]
+    summary = {
+        "version": version,
+        "runs": repeat,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "returncode": measures[-1]["returncode"],
+        "findings": len(findings),
+    }
+    for key in ("max_rss_bytes", "read_bytes", "write_bytes"):
+        if key in measures[-1]:
+            summary[key] = max(measure[key] for measure in measures)
+    if "stderr" in measures[-1]:
+        summary["stderr"] = measures[-1]["stderr"]
+    return summary, findings
+
+# ------------------------------
+# COMPARAISON
+# ------------------------------
+def compare_findings(previous, current):
+    """ Compare deux ensembles de résultats : disparus (régressions possibles) et nouveaux. """
+    return {"lost": sorted(previous - current), "new": sorted(current - previous)}
+
+def print_report(summaries, comparisons):
+    print(f"{'Version':<10}{'min (s)':>10}{'médiane (s)':>13}{'RSS max (Mo)':>14}{'lus (Ko)':>13}{'résultats':>11}")
+    for summary in summaries:
+        rss = summary.get("max_rss_bytes")
+        rss_text = f"{rss / (1024 * 1024):.1f}" if rss is not None else "-"
+        read = summary.get("read_bytes")
+        read_text = f"{read / 1024:.0f}" if read is not None else "-"
+        print(f"V{summary['version']:<9}{summary['min_seconds']:>10.3f}{summary['median_seconds']:>13.3f}"
+              f"{rss_text:>14}{read_text:>13}{summary['findings']:>11}")
+        if summary["returncode"] != 0:
+            print(f"    Code retour {summary['returncode']}: {' '.join(summary.get('stderr', []))}")
+    for comparison in comparisons:
+        print(f"\nV{comparison['from']} -> V{comparison['to']} : "
+              f"{len(comparison['lost'])} résultat(s) disparu(s), {len(comparison['new'])} nouveau(x), "
+              f"accélération x{comparison['speedup']:.2f}")
+        for finding in comparison["lost"]:
+            print(f"    - {finding}")
+        for finding in comparison["new"]:
+            print(f"    + {finding}")
+
+# ------------------------------
+# POINT D'ENTRÉE PRINCIPAL
+# ------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison des résultats et des performances des versions de CheckScript.")
+    parser.add_argument("environment", choices=["PROD", "PREPROD", "DEV"], help="Environnement à analyser.")
+    parser.add_argument("--versions", nargs="*", help="Versions à comparer (par défaut toutes, ex: 1.4.1 1.5).")
+    parser.add_argument("--projects", type=int, default=50, help="Nombre de projets générés.")
+    parser.add_argument("--depth", type=int, default=3, help="Profondeur des sous-dossiers de chaque projet.")
+    parser.add_argument("--files-per-dir", type=int, default=5, help="Nombre de fichiers par sous-dossier.")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de génération de l'arborescence.")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'exécutions par version.")
+    parser.add_argument("--max-slowdown", type=float, default=1.10,
+                        help="Ralentissement toléré de la dernière version par rapport à la précédente (temps minimal).")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer le rapport.")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR,
+                        help="Dossier de travail (arborescence générée et copies des versions), sans nom de dossier interdit dans son chemin.")
+    args = parser.parse_args()
+    work_dir = os.path.abspath(args.work_dir)
+    forbidden_in_path = [name for name in FORBIDDEN_NAMES if name in work_dir]
+    if forbidden_in_path:
+        parser.error(f"Le chemin du dossier de travail {work_dir} contient {', '.join(forbidden_in_path)} : "
+                     f"les anciennes versions ignoreraient tous les fichiers. Utilisez --work-dir.")
+
+    versions = find_versions()
+    if args.versions:
+        versions = [item for item in versions if item[0] in args.versions]
+    if not versions:
+        parser.error("Aucune version de CheckScript trouvée.")
+
+    created_work_dir = not os.path.exists(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+    # Sous-dossier propre à cette exécution, dont le nom aléatoire ne contient pas non plus de nom interdit
+    run_dir = tempfile.mkdtemp(prefix="run_", dir=work_dir)
+    while any(name in os.path.basename(run_dir) for name in FORBIDDEN_NAMES):
+        os.rmdir(run_dir)
+        run_dir = tempfile.mkdtemp(prefix="run_", dir=work_dir)
+    tree_dir = os.path.join(run_dir, "tree")
+    try:
+        generate_tree(tree_dir, args.environment, args.projects, args.depth, args.files_per_dir, seed=args.seed)
+
+        summaries, all_findings = [], []
+        for version, script_path in versions:
+            print(f"Exécution de V{version}...")
+            summary, findings = run_version(version, script_path, args.environment, tree_dir, args.repeat, run_dir)
+            summaries.append(summary)
+            all_findings.append(findings)
+
+        comparisons = []
+        for index in range(1, len(summaries)):
+            comparison = compare_findings(all_findings[index - 1], all_findings[index])
+            comparison["from"] = summaries[index - 1]["version"]
+            comparison["to"] = summaries[index]["version"]
+            comparison["speedup"] = summaries[index - 1]["min_seconds"] / max(summaries[index]["min_seconds"], 1e-9)
+            comparisons.append(comparison)
+
+        print_report(summaries, comparisons)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as report:
+                json.dump({"environment": args.environment, "projects": args.projects, "seed": args.seed,
+                           "versions": summaries, "comparisons": comparisons}, report, indent=2, ensure_ascii=False)
+    finally:
+        # Seuls les dossiers créés par le banc d'essai sont supprimés
+        shutil.rmtree(run_dir, ignore_errors=True)
+        if created_work_dir and not os.listdir(work_dir):
+            os.rmdir(work_dir)
+
+    # Code retour non nul si la dernière version perd des résultats ou ralentit au-delà de la tolérance
+    if comparisons:
+        last = comparisons[-1]
+        if last["lost"] or 1 / last["speedup"] > args.max_slowdown:
+            sys.exit(1)
@@ -0,0 +1,1310 @@
+import os
+import re
+import json
+import stat
+import fnmatch
+import time
+import zlib
+import queue
+import hashlib
+import argparse
+import threading
+from collections import namedtuple
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+# ------------------------------
+# CONSTANTES ET CONFIGURATION
+# ------------------------------
+FORBIDDEN_FOLDERS = {"Temp", "CleanBackUp", "DebuggerSave", "files", "Flow124"}
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+LOGS_DIR = os.path.join(SCRIPT_DIR, "logs")
+RESULTS_DIR = os.path.join(SCRIPT_DIR, "resultats")
+LOG_FILE = os.path.join(LOGS_DIR, "Checks_Log.txt")
+RESULTS_FILE = os.path.join(RESULTS_DIR, "Checks_Results.txt")
+FORBIDDEN_RULES_FILE = os.path.join(SCRIPT_DIR, "forbidden_folders.json")
+BASELINE_FILE = os.path.join(SCRIPT_DIR, "Checks_Baseline.txt")
+PROJECT_CHECKS = {"projects_folder", "projects_missing"}  # vérifications de --check-projects
+UNBASELINED_CHECKS = {"unreachable"}  # résultats jamais acceptés dans la baseline
+RESULT_GROUP_ORDER = {"forbidden_folder": 0, "version_file": 1}  # ordre des résultats dans le fichier, les autres ensuite
+IO_TIMEOUT = 30  # secondes maximum par lecture de dossier ou de fichier (montages réseau bloqués)
+IO_WORKERS = 8
+WALK_QUEUE_SIZE = 256  # dossiers listés d'avance au maximum par le thread de parcours
+CHECK_BATCH_SIZE = 64  # fichiers par lot envoyé au pool de processus (amortit le coût des échanges)
+VERSION_FILE_NAME = os.path.normcase("Version.txt")
+MAGIC_FOLDERS = {
+    "DEV": "MagicDev",
+    "PREPROD": "MagicPPrd",
+    "PROD": "MagicPrd"
+}
+
+# Liste des adresses longues valides, séparées par environnement
+VALID_SERVERS = {
+    "DEV": [
+        "wezjwcxpadwv002.pwcglb.com",
+    ],
+    "PREPROD": [
+        "wezjwcxpapwv001.pwcglb.com",
+        "wezjwcxpapwv002.pwcglb.com",
+    ],
+    "PROD": [
+        "wezjwcxpapwv004.pwcglb.com",
+        "wezjwcxpapwv005.pwcglb.com",
+    ],
+}
+
+# ------------------------------
+# LOGGING
+# ------------------------------
+def log_message(message, level="SUCCESS"):
+    """ Écrit un message dans le fichier log et l'affiche à l'écran. """
+    timestamp = datetime.now().strftime("%Y-%m-%d;%H:%M:%S.") + f"{datetime.now().microsecond // 1000:03d}"
+    formatted_message = f"{timestamp};0;{level};{message}"
+    try:
+        with open(LOG_FILE, "a", encoding="utf-8", errors="ignore") as log:
+            log.write(f"{formatted_message}\n")
+        print(formatted_message)
+    except Exception as e:
+        print(f"Erreur lors de l'écriture dans le log : {e}")
+
+# ------------------------------
+# Dossiers et fichiers
+# ------------------------------
+def ensure_writable(path, is_directory=True):
+    """ Vérifie qu'un fichier ou dossier est accessible en écriture et le crée si nécessaire. """
+    if is_directory:
+        if not os.path.exists(path):
+            os.makedirs(path, exist_ok=True)
+            log_message(f"Création du dossier: {path}", level="INFO")
+        os.chmod(path, 0o777)
+    else:
+        if os.path.exists(path):
+            os.chmod(path, 0o777)
+
+def prepare_output_files():
+    """ Création/vidage des fichiers de logs et résultats au démarrage.
+
+    Appelée depuis le point d'entrée uniquement : les processus du pool de vérification réimportent
+    le script et ne doivent pas vider les fichiers en cours d'analyse.
+    """
+    ensure_writable(LOGS_DIR, is_directory=True)
+    ensure_writable(RESULTS_DIR, is_directory=True)
+    ensure_writable(LOG_FILE, is_directory=False)
+    ensure_writable(RESULTS_FILE, is_directory=False)
+
+    open(LOG_FILE, "w", encoding="utf-8").close()
+    open(RESULTS_FILE, "w", encoding="utf-8").close()
+
+# ------------------------------
+# RÉSULTATS ET BASELINE
+# ------------------------------
+# check : identifiant stable de la vérification, values : valeurs clés du résultat (hors chemin)
+Finding = namedtuple("Finding", ["check", "level", "path", "values", "message"])
+
+def make_finding(check, level, path, message, *values):
+    """ Construit un résultat structuré pour une vérification. """
+    return Finding(check, level, path, tuple(str(value) for value in values), message)
+
+def relative_finding_path(path, root_dir):
+    """ Chemin d'un résultat relatif au dossier analysé, séparé par des "/" ("" pour un résultat sans chemin). """
+    return os.path.relpath(path, root_dir).replace(os.sep, "/") if path else ""
+
+def finding_fingerprint(finding, root_dir):
+    """ Empreinte stable d'un résultat : vérification + chemin relatif normalisé + valeurs clés. """
+    normalized_path = os.path.normcase(relative_finding_path(finding.path, root_dir)).replace(os.sep, "/")
+    key = "|".join((finding.check, normalized_path) + finding.values)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def load_baseline(baseline_file):
+    """ Charge les empreintes acceptées (une par ligne, suivie du message pour information). """
+    fingerprints = set()
+    if not os.path.exists(baseline_file):
+        return fingerprints
+    try:
+        with open(baseline_file, "r", encoding="utf-8", errors="ignore") as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    fingerprints.add(line.split(";", 1)[0])
+        log_message(f"{len(fingerprints)} résultat(s) accepté(s) chargé(s) depuis {baseline_file}", level="INFO")
+    except Exception as e:
+        log_message(f"Erreur lors de la lecture de la baseline {baseline_file} : {e}", level="WARNING")
+    return fingerprints
+
+def save_baseline(findings, root_dir, baseline_file, project_checks=False):
+    """ Met à jour la baseline avec les résultats de l'analyse.
+
+    Seules les entrées de la famille de vérifications effectuée sont remplacées (comparaison des projets avec
+    --check-projects, dossiers et fichiers sinon) : les entrées de l'autre famille sont conservées.
+    Les chemins inaccessibles ne sont jamais acceptés.
+    """
+    kept = []
+    if os.path.exists(baseline_file):
+        with open(baseline_file, "r", encoding="utf-8", errors="ignore") as file:
+            for line in file:
+                line = line.rstrip("\n")
+                parts = line.split(";", 2)
+                if line and not line.startswith("#") and len(parts) == 3 and (parts[1] in PROJECT_CHECKS) != project_checks:
+                    kept.append(line)
+    accepted = [finding for finding in findings if finding.check not in UNBASELINED_CHECKS]
+    try:
+        with open(baseline_file, "w", encoding="utf-8", errors="ignore") as file:
+            file.write("# Résultats acceptés : empreinte;vérification;message\n")
+            for line in kept:
+                file.write(f"{line}\n")
+            for finding in accepted:
+                file.write(f"{finding_fingerprint(finding, root_dir)};{finding.check};{finding.message}\n")
+        log_message(f"Baseline mise à jour avec {len(accepted)} résultat(s) ({len(kept)} conservé(s)) dans {baseline_file}",
+                    level="SUCCESS")
+    except Exception as e:
+        log_message(f"Erreur lors de la sauvegarde de la baseline : {e}", level="WARNING")
+
+class ResultCollector:
+    """ Collecte les résultats de l'analyse en écartant ceux présents dans la baseline.
+
+    Les résultats retenus sont écrits dans le log à leur ajout : les résultats acceptés n'y apparaissent pas.
+    """
+
+    def __init__(self, root_dir, baseline=frozenset()):
+        self.root_dir = root_dir
+        self.baseline = baseline
+        self.findings = []
+        self.suppressed = 0
+
+    def add(self, finding):
+        if self.baseline and finding_fingerprint(finding, self.root_dir) in self.baseline:
+            self.suppressed += 1
+            return
+        self.findings.append(finding)
+        log_message(finding.message, level=finding.level)
+
+    def extend(self, findings):
+        for finding in findings:
+            self.add(finding)
+
+# ------------------------------
+# ACCÈS AUX FICHIERS
+# ------------------------------
+class IOTimeout(OSError):
+    """ Opération d'E/S abandonnée après le délai maximal. """
+
+def is_directory_link(entry):
+    """ Vrai si l'entrée est un lien symbolique vers un dossier ou une jonction Windows. """
+    if entry.is_symlink():
+        return entry.is_dir()
+    if hasattr(entry, "is_junction"):
+        return entry.is_junction()
+    # Python < 3.12 : une jonction est un point de montage (reparse point) sous Windows
+    return os.name == "nt" and entry.is_dir() and \
+        getattr(entry.stat(follow_symlinks=False), "st_reparse_tag", 0) == getattr(stat, "IO_REPARSE_TAG_MOUNT_POINT", -1)
+
+def walk_listings(pending, list_dir, descend):
+    """ Parcours en profondeur depuis la pile pending : (dossier, dossiers, fichiers) pour chaque dossier lisible.
+
+    descend(dossier, nom) indique s'il faut parcourir un sous-dossier ; les sous-dossiers sont choisis avant de
+    rendre le dossier, modifier dossiers ensuite n'a pas d'effet.
+    """
+    while pending:
+        dirpath = pending.pop()
+        listing = list_dir(dirpath)
+        if listing is None:
+            continue
+        dirnames, filenames = listing
+        pending.extend(os.path.join(dirpath, dir_name) for dir_name in reversed(dirnames) if descend(dirpath, dir_name))
+        yield dirpath, dirnames, filenames
+
+class LocalFileSystem:
+    """ Accès direct au disque, sans délai maximal. """
+    unreachable = frozenset()
+
+    def __init__(self):
+        # Compteurs exportés dans les métriques
+        self.visited_dirs = set()
+        self.files_visited = 0
+        self.bytes_read = 0
+
+    def _visit(self, dirpath, filenames):
+        # Un dossier listé par plusieurs parcours (ou modes) n'est compté qu'une fois
+        if dirpath not in self.visited_dirs:
+            self.visited_dirs.add(dirpath)
+            self.files_visited += len(filenames)
+
+    def list_dir(self, path):
+        """ Renvoie (dossiers, fichiers) du dossier, ou None s'il est illisible.
+
+        Comme os.walk(followlinks=False), les liens vers des dossiers (liens symboliques, jonctions) ne sont pas
+        parcourus : ils sont ignorés, ainsi que les entrées illisibles.
+        """
+        try:
+            dirnames, filenames = [], []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if is_directory_link(entry):
+                            continue
+                        (dirnames if entry.is_dir() else filenames).append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        self._visit(path, filenames)
+        return dirnames, filenames
+
+    def walk(self, pending, descend, prefetch=None):
+        # Sans délai maximal, les fichiers sont lus à la demande : prefetch est sans objet
+        return walk_listings(pending, self.list_dir, descend)
+
+    def read_bytes(self, path):
+        with open(path, "rb") as file:
+            content = file.read()
+        self.bytes_read += len(content)
+        return content
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def getmtime(self, path):
+        """ Date de modification, 0 si elle est illisible. """
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+
+    def unreachable_findings(self):
+        return []
+
+class TimedFileSystem:
+    """ Exécute les accès d'un système de fichiers (backend) dans des threads avec un délai maximal.
+
+    Un dossier dont la lecture dépasse le délai est noté inaccessible et sa sous-arborescence est ignorée ;
+    le thread bloqué est abandonné et remplacé pour que le reste de l'analyse continue.
+    Les parcours sont exécutés en continu par un thread dédié (walk), qui lit aussi d'avance les fichiers à analyser :
+    pas d'aller-retour entre threads par dossier ni par fichier.
+    """
+
+    def __init__(self, timeout=IO_TIMEOUT, workers=IO_WORKERS, backend=None):
+        self.timeout = timeout
+        self.backend = backend or LocalFileSystem()
+        self.unreachable = set()
+        self.visited_dirs = set()
+        self.files_visited = 0
+        self.bytes_read = 0
+        # Contenus lus d'avance par le producteur de walk, en attente de read_bytes, et fichiers abandonnés par walk
+        self.prefetched = {}
+        self.abandoned_files = set()
+        self.tasks = queue.Queue()
+        for _ in range(workers):
+            self._start_worker()
+
+    def _visit(self, dirpath, filenames):
+        if dirpath not in self.visited_dirs:
+            self.visited_dirs.add(dirpath)
+            self.files_visited += len(filenames)
+
+    def _start_worker(self):
+        # Threads démons : un appel bloqué sur un montage réseau n'empêche pas le script de se terminer
+        threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        while True:
+            function, args, outcome, done = self.tasks.get()
+            try:
+                outcome.append((True, function(*args)))
+            except BaseException as e:
+                outcome.append((False, e))
+            done.set()
+
+    def _call(self, path, function, *args):
+        outcome, done = [], threading.Event()
+        self.tasks.put((function, args, outcome, done))
+        if not done.wait(self.timeout):
+            self._start_worker()
+            log_message(f"Délai de {self.timeout}s dépassé, accès abandonné : {path}", level="WARNING")
+            raise IOTimeout(f"délai de {self.timeout}s dépassé")
+        succeeded, value = outcome[0]
+        if succeeded:
+            return value
+        raise value
+
+    def list_dir(self, path):
+        if path in self.unreachable:
+            return None
+        try:
+            listing = self._call(path, self.backend.list_dir, path)
+        except IOTimeout:
+            self.unreachable.add(path)
+            return None
+        except OSError:
+            return None
+        if listing is not None:
+            self._visit(path, listing[1])
+        return listing
+
+    def walk(self, pending, descend, prefetch=None):
+        """ Parcours en profondeur (comme walk_listings) exécuté par un thread producteur qui liste les dossiers d'avance.
+
+        prefetch(dossier, nom) indique les fichiers que le producteur lit aussi d'avance pour read_bytes. Si le listage
+        d'un dossier ou la lecture d'un fichier dépasse à elle seule le délai, ce chemin est noté
+        inaccessible, le producteur est abandonné et un nouveau reprend avec les dossiers restants.
+        """
+        pending = list(pending)
+        while pending:
+            # Un seul verrou pour l'état partagé : dossiers à parcourir, élément en cours, dossiers listés prêts
+            state = {"pending": pending, "current": None, "started": 0, "reading": None, "ready": [], "done": False,
+                     "abandoned": False}
+            condition = threading.Condition()
+            threading.Thread(target=self._produce, args=(state, condition, descend, prefetch), daemon=True).start()
+            try:
+                while True:
+                    with condition:
+                        stuck = None
+                        while not state["ready"] and not state["done"]:
+                            # Le délai s'applique à l'opération en cours (listage ou lecture), pas à leur somme
+                            elapsed = time.monotonic() - state["started"] if state["current"] is not None else 0
+                            if elapsed >= self.timeout:
+                                stuck, state["abandoned"] = state["current"], True
+                                break
+                            condition.wait(self.timeout - elapsed)
+                        ready, state["ready"] = state["ready"], []
+                        done = state["done"]
+                        # Réveille le producteur s'il attendait de la place
+                        condition.notify()
+                    for item in ready:
+                        yield from self._listed(item)
+                    if done:
+                        return
+                    if stuck is not None:
+                        # Un fichier abandonné est signalé par la vérification qui le lit (erreur de lecture)
+                        (self.abandoned_files if state["reading"] is not None else self.unreachable).add(stuck)
+                        log_message(f"Délai de {self.timeout}s dépassé, accès abandonné : {stuck}", level="WARNING")
+                        # Dossier listé dont un fichier lu d'avance est bloqué, puis reprise avec les dossiers restants
+                        if state["reading"] is not None:
+                            yield from self._listed(state["reading"])
+                        pending = state["pending"]
+                        break
+            finally:
+                with condition:
+                    state["abandoned"] = True
+                    condition.notify()
+                self.prefetched.clear()
+
+    def _listed(self, item):
+        if isinstance(item, BaseException):
+            raise item
+        self._visit(item[0], item[2])
+        yield item
+
+    def _produce(self, state, condition, descend, prefetch):
+        """ Thread producteur de walk : liste les dossiers de state["pending"] tant qu'il n'est pas abandonné. """
+        try:
+            while True:
+                with condition:
+                    while len(state["ready"]) >= WALK_QUEUE_SIZE and not state["abandoned"]:
+                        condition.wait()
+                    if state["abandoned"]:
+                        return
+                    if not state["pending"]:
+                        state["done"] = True
+                        condition.notify()
+                        return
+                    dirpath = state["current"] = state["pending"].pop()
+                    state["started"] = time.monotonic()
+                listing = self.backend.list_dir(dirpath)
+                with condition:
+                    if state["abandoned"]:
+                        return
+                    state["current"] = None
+                    if listing is None:
+                        continue
+                    dirnames, filenames = listing
+                    state["pending"].extend(os.path.join(dirpath, dir_name) for dir_name in reversed(dirnames)
+                                            if descend(dirpath, dir_name))
+                    item = state["reading"] = (dirpath, dirnames, filenames)
+                for file_name in filenames:
+                    if prefetch is None or not prefetch(dirpath, file_name):
+                        continue
+                    file_path = os.path.join(dirpath, file_name)
+                    with condition:
+                        if state["abandoned"]:
+                            return
+                        state["current"] = file_path
+                        state["started"] = time.monotonic()
+                    try:
+                        outcome = (True, self.backend.read_bytes(file_path))
+                    except Exception as e:
+                        outcome = (False, e)
+                    with condition:
+                        if state["abandoned"]:
+                            return
+                        state["current"] = None
+                        self.prefetched[file_path] = outcome
+                with condition:
+                    if state["abandoned"]:
+                        return
+                    state["reading"] = None
+                    state["ready"].append(item)
+                    if len(state["ready"]) == 1:
+                        condition.notify()
+        except BaseException as e:
+            with condition:
+                state["ready"].append(e)
+                state["done"] = True
+                condition.notify()
+
+    def read_bytes(self, path):
+        # Un fichier abandonné est signalé par la vérification qui le lit (erreur de lecture)
+        outcome = self.prefetched.pop(path, None)
+        if outcome is None:
+            if path in self.abandoned_files:
+                raise IOTimeout(f"délai de {self.timeout}s dépassé")
+            outcome = (True, self._call(path, self.backend.read_bytes, path))
+        succeeded, content = outcome
+        if not succeeded:
+            raise content
+        self.bytes_read += len(content)
+        return content
+
+    def exists(self, path):
+        try:
+            return self._call(path, self.backend.exists, path)
+        except IOTimeout:
+            self.unreachable.add(path)
+            return False
+
+    def getmtime(self, path):
+        try:
+            return self._call(path, self.backend.getmtime, path)
+        except IOTimeout:
+            return 0
+
+    def unreachable_findings(self):
+        """ Un résultat par dossier (ou chemin testé) abandonné. """
+        return [make_finding("unreachable", "ERROR", path,
+                             f"Dossier ou fichier inaccessible (délai de {self.timeout}s dépassé), non vérifié : {path}")
+                for path in sorted(self.unreachable)]
+
+LOCAL_FS = LocalFileSystem()
+
+# ------------------------------
+# VÉRIFICATIONS
+# ------------------------------
+class ForbiddenFolderMatcher:
+    """ Compare un nom de dossier (un composant de chemin) aux règles de dossiers interdits. """
+
+    def __init__(self, entries):
+        # Les noms exacts sont testés en O(1), les globs sont compilés en une seule expression régulière
+        self.names = frozenset(e for e in entries if not any(c in e for c in "*?["))
+        patterns = [e for e in entries if e not in self.names]
+        self.patterns = re.compile("|".join(fnmatch.translate(p) for p in patterns)) if patterns else None
+
+    def match(self, dir_name):
+        """ Renvoie True si le nom de dossier est interdit. """
+        if dir_name in self.names:
+            return True
+        return self.patterns is not None and self.patterns.match(dir_name) is not None
+
+def load_forbidden_matcher(environment, rules_file=FORBIDDEN_RULES_FILE):
+    """ Charge les règles de dossiers interdits ("ALL" + environnement) et les compile en matcher. """
+    rules = {"ALL": sorted(FORBIDDEN_FOLDERS)}
+    if os.path.exists(rules_file):
+        try:
+            with open(rules_file, "r", encoding="utf-8") as file:
+                rules = json.load(file)
+        except Exception as e:
+            log_message(f"Erreur lors de la lecture des règles {rules_file}, règles par défaut utilisées : {e}", level="WARNING")
+    entries = set(rules.get("ALL", [])) | set(rules.get(environment, []))
+    return ForbiddenFolderMatcher(entries)
+
+def project_shard(project_name, shard_count):
+    """ Numéro de shard (1..N) d'un dossier de premier niveau, identique sur toutes les machines. """
+    return zlib.crc32(project_name.lower().encode("utf-8")) % shard_count + 1
+
+class ProjectSelection:
+    """ Choix et ordre des dossiers de premier niveau à analyser : shard i/N, échantillon, priorité aux récents.
+
+    Le shard et l'échantillon reposent sur un hachage du nom : même résultat sur toutes les machines et à chaque
+    exécution, et un même projet est retenu (ou non) dans tous les environnements.
+    """
+
+    def __init__(self, shard=None, sample=None, sample_seed=0, prioritize=None):
+        self.shard = shard
+        self.sample = sample
+        self.sample_seed = sample_seed
+        self.prioritize = prioritize
+        # Sélection déjà calculée par dossier racine : (tous les dossiers, dossiers retenus dans l'ordre)
+        self.selections = {}
+
+    def in_sample(self, dir_name):
+        digest = hashlib.sha1(f"{self.sample_seed}:{dir_name.lower()}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64 < self.sample
+
+    def select(self, root_dir, dirnames, fs=LOCAL_FS):
+        """ Dossiers de premier niveau retenus, dans l'ordre où ils doivent être analysés. """
+        if root_dir not in self.selections:
+            selected = list(dirnames)
+            if self.shard is not None:
+                index, count = self.shard
+                selected = [dir_name for dir_name in selected if project_shard(dir_name, count) == index]
+            if self.sample is not None:
+                selected = [dir_name for dir_name in selected if self.in_sample(dir_name)]
+            if self.prioritize == "recent":
+                # Projets PWC_ modifiés le plus récemment d'abord, puis les autres dossiers
+                mtimes = {dir_name: fs.getmtime(os.path.join(root_dir, dir_name)) for dir_name in selected}
+                selected.sort(key=lambda dir_name: (not dir_name.startswith("PWC_"), -mtimes[dir_name]))
+            self.selections[root_dir] = (list(dirnames), selected)
+        return list(self.selections[root_dir][1])
+
+    def includes_root_files(self):
+        """ Les fichiers de la racine vont au shard 1 (et sont toujours inclus dans un échantillon). """
+        return self.shard is None or self.shard[0] == 1
+
+    def listed_dirs(self, root_dir):
+        """ Tous les dossiers de premier niveau de root_dir, avant shard et échantillon. """
+        return list(self.selections.get(root_dir, ([], []))[0])
+
+    def selected_dirs(self, root_dir):
+        """ Noms des dossiers de premier niveau retenus pour root_dir. """
+        return set(self.selections.get(root_dir, ([], []))[1])
+
+    def sampled_fraction(self, root_dir):
+        """ Part réelle des dossiers de premier niveau retenue par l'échantillon. """
+        listed, selected = self.selections.get(root_dir, ([], []))
+        return len(selected) / len(listed) if listed else 0
+
+ALL_PROJECTS = ProjectSelection()
+
+def walk_tree(root_dir, selection=ALL_PROJECTS, fs=LOCAL_FS, descend=None, prefetch=None):
+    """ Parcours descendant comme os.walk, au travers de fs, limité au premier niveau aux dossiers de la sélection.
+
+    descend(dossier, nom) indique s'il faut parcourir un sous-dossier (tous par défaut) : les sous-dossiers sont
+    listés d'avance, modifier la liste des dossiers rendue n'a pas d'effet. prefetch(dossier, nom) indique les
+    fichiers à lire d'avance (voir TimedFileSystem.walk). Les dossiers illisibles ou inaccessibles sont ignorés.
+    """
+    descend = descend or (lambda dirpath, dir_name: True)
+    listing = fs.list_dir(root_dir)
+    if listing is None:
+        return
+    dirnames, filenames = listing
+    dirnames = selection.select(root_dir, dirnames, fs)
+    if not selection.includes_root_files():
+        filenames = []
+    yield root_dir, dirnames, filenames
+    pending = [os.path.join(root_dir, dir_name) for dir_name in reversed(dirnames) if descend(root_dir, dir_name)]
+    yield from fs.walk(pending, descend, prefetch)
+
+class DirectoryIndex:
+    """ Index des dossiers rempli pendant un parcours : dossiers contenant DebuggerSave et dossiers contenant Version.txt. """
+
+    def __init__(self, root_dir=None, selection=ALL_PROJECTS):
+        self.root_dir = root_dir
+        self.selection = selection
+        self.debugger_dirs = []  # dans l'ordre du parcours
+        self.version_dirs = set()
+
+    def record(self, dirpath, dirnames, filenames):
+        if dirpath == self.root_dir:
+            # La racine est indexée d'après tous ses dossiers (avant shard et échantillon),
+            # par le seul shard qui analyse ses fichiers
+            if not self.selection.includes_root_files():
+                return
+            dirnames = self.selection.listed_dirs(dirpath)
+        if "DebuggerSave" in dirnames:
+            self.debugger_dirs.append(dirpath)
+        # Comparaison comme os.path.exists : insensible à la casse sous Windows
+        if VERSION_FILE_NAME in (os.path.normcase(file_name) for file_name in filenames):
+            self.version_dirs.add(dirpath)
+
+    def missing_version_files(self, start=0):
+        """ Dossiers contenant DebuggerSave mais pas Version.txt (différence d'ensembles, sans E/S), à partir du
+        dossier DebuggerSave de rang start dans l'ordre du parcours. """
+        return [dirpath for dirpath in self.debugger_dirs[start:] if dirpath not in self.version_dirs]
+
+def check_license_in_ini(file_path, expected_license, fs=LOCAL_FS):
+    """ Vérifie la licence dans le fichier ifs.ini et renvoie une erreur si elle est incorrecte. """
+    try:
+        content = fs.read_bytes(file_path).decode("utf-8", errors="ignore")
+        match = re.search(r"\[MAGIC_ENV\]LicenseName=(\S+)", content)
+        if not match:
+            return make_finding("license", "ERROR", file_path,
+                                f"Erreur de licence dans {file_path}: Aucune licence trouvée, attendue '{expected_license}'.",
+                                "", expected_license)
+        found_license = f"LicenseName={match.group(1)}"
+        if found_license != expected_license:
+            return make_finding("license", "ERROR", file_path,
+                                f"Erreur de licence dans {file_path}: trouvée '{found_license}', attendue '{expected_license}'.",
+                                found_license, expected_license)
+        return None
+    except Exception as e:
+        return make_finding("license_read", "ERROR", file_path, f"Erreur lors de la lecture du fichier {file_path}: {e}")
+
+def check_version_files(index, start=0):
+    """ Vérifie la présence du fichier Version.txt dans tous les dossiers contenant DebuggerSave, à partir de l'index
+    (seulement ceux indexés à partir du rang start). """
+    errors = []
+    for dirpath in index.missing_version_files(start):
+        version_file = os.path.join(dirpath, "Version.txt")
+        errors.append(make_finding("version_file", "ERROR", version_file, f"Veuillez ajouter ce fichier manquant: {version_file}"))
+    return errors
+
+def check_suo_file(file_path, root_dir, environment):
+    """ Vérifie les fichiers .suo en PROD ou PREPROD. """
+    if environment in ["PREPROD", "PROD"] and file_path.lower().endswith(".suo"):
+        relative_path = os.path.relpath(file_path, root_dir)
+        if len(relative_path.split(os.sep)) == 2:
+            return make_finding("suo_file", "ERROR", file_path, f"Veuillez supprimer ce fichier en {environment}: {file_path}")
+    return None
+
+def check_start_xml(file_path, environment, fs=LOCAL_FS):
+    """ Vérifie le fichier start.xml et sa cohérence d'environnement et les adresses des serveurs. """
+    erreurs = []
+    env_mapping = {"DEV": "MagicDev", "PREPROD": "MagicPPrd", "PROD": "MagicPrd"}
+    expected_magic_env = env_mapping.get(environment, "")
+    valid_servers = VALID_SERVERS.get(environment, [])
+
+    try:
+        root = ET.fromstring(fs.read_bytes(file_path))
+        project_element = root.find(".//Project")
+
+        if project_element is not None:
+            projects_dir = project_element.get("ProjectsDirPath", "")
+            detected_env = None
+
+            for key, value in env_mapping.items():
+                if value in projects_dir:
+                    detected_env = value
+                    break
+
+            if detected_env and detected_env != expected_magic_env:
+                corrected_path = projects_dir.replace(detected_env, expected_magic_env)
+                erreur_message = (f"Incohérence dans {file_path}: Environnement détecté '{detected_env}', "
+                                  f"mais attendu '{expected_magic_env}'. "
+                                  f"Veuillez corriger en : ProjectsDirPath='{corrected_path}'")
+                erreurs.append(make_finding("start_xml_env", "WARNING", file_path, erreur_message, detected_env, expected_magic_env))
+
+            # Vérification des adresses serveurs
+            server_element = root.find(".//Server")
+            if server_element is not None:
+                host = server_element.get("host")
+                alternate_hosts = server_element.get("alternateHosts", "")
+
+                # Vérifier que l'adresse du serveur est valide
+                if host not in valid_servers:
+                    erreur_message = (f"Adresse serveur invalide dans {file_path}: {host}. "
+                                      f"L'adresse détectée dans start.xml est '{host}', "
+                                      f"et l'adresse attendue doit être une des adresses suivantes : "
+                                      f"{', '.join(valid_servers)}")
+                    erreurs.append(make_finding("start_xml_host", "ERROR", file_path, erreur_message, host))
+
+                # Vérification des alternateHosts uniquement si l'environnement n'est pas DEV ou si alternateHosts est non vide
+                if environment != "DEV" or alternate_hosts:
+                    for alternate_host in alternate_hosts.split(","):
+                        if alternate_host not in valid_servers:
+                            erreur_message = (f"Adresse alternateHosts invalide dans {file_path}: {alternate_host}. "
+                                              f"L'adresse détectée dans start.xml est '{alternate_host}', "
+                                              f"et l'adresse attendue doit être une des adresses suivantes : "
+                                              f"{', '.join(valid_servers)}")
+                            erreurs.append(make_finding("start_xml_alternate_host", "ERROR", file_path,
+                                                        erreur_message, alternate_host))
+
+    except Exception as e:
+        erreurs.append(make_finding("start_xml_read", "ERROR", file_path, f"Erreur de lecture du fichier XML {file_path}: {e}"))
+
+    return erreurs
+
+def file_check_kind(file_path, file_name, root_dir):
+    """ Vérification à appliquer à un fichier : "license", "suo", "start_xml" ou None. """
+    # Les fichiers des dossiers interdits sont déjà écartés par full_check
+    # Vérification uniquement si le fichier ifs.ini est à la racine du dossier (pas dans un sous-dossier comme Temp)
+    if file_name.lower() == 'ifs.ini' and os.path.dirname(file_path) == root_dir:
+        return "license"
+    elif file_name.lower().endswith('.suo'):
+        return "suo"
+    elif file_name.lower() == "start.xml":
+        return "start_xml"
+    return None
+
+def run_file_check(kind, file_path, expected_license, root_dir, environment, fs=LOCAL_FS):
+    """ Exécute la vérification d'un fichier et renvoie la liste de ses erreurs. """
+    errors = []
+    if kind == "license":
+        license_error = check_license_in_ini(file_path, expected_license, fs)
+        if license_error:
+            errors.append(license_error)
+    elif kind == "suo":
+        suo_error = check_suo_file(file_path, root_dir, environment)
+        if suo_error:
+            errors.append(suo_error)
+    elif kind == "start_xml":
+        errors.extend(check_start_xml(file_path, environment, fs))
+    return errors
+
+def process_file(file_path, file_name, expected_license, root_dir, environment, fs=LOCAL_FS):
+    """ Processus de vérification pour chaque fichier. """
+    return run_file_check(file_check_kind(file_path, file_name, root_dir), file_path,
+                          expected_license, root_dir, environment, fs)
+
+# ------------------------------
+# VÉRIFICATIONS EN PARALLÈLE
+# ------------------------------
+# Vérifications qui lisent et analysent le contenu des fichiers (coûteuses en CPU)
+CONTENT_CHECKS = {"license", "start_xml"}
+WORKER_FS = LOCAL_FS
+
+def init_check_worker(io_timeout):
+    """ Initialisation d'un processus du pool : son propre accès aux fichiers avec délai maximal. """
+    global WORKER_FS
+    WORKER_FS = TimedFileSystem(io_timeout) if io_timeout > 0 else LOCAL_FS
+
+def check_file_batch(batch, expected_license, root_dir, environment):
+    """ Exécuté dans un processus du pool : vérifie un lot de (vérification, fichier).
+
+    Renvoie (erreurs de chaque fichier, octets lus par le lot).
+    """
+    bytes_before = WORKER_FS.bytes_read
+    errors = [run_file_check(kind, file_path, expected_license, root_dir, environment, WORKER_FS)
+              for kind, file_path in batch]
+    return errors, WORKER_FS.bytes_read - bytes_before
+
+class ContentCheckPipeline:
+    """ Producteur/consommateur : le parcours envoie les fichiers à analyser, par lots, à un pool de processus.
+
+    Les résultats sont restitués dans l'ordre du parcours, quel que soit l'ordre de fin des lots.
+    """
+
+    def __init__(self, workers, expected_license, root_dir, environment, io_timeout=0, batch_size=CHECK_BATCH_SIZE):
+        # Import différé : multiprocessing alourdit le démarrage du script lorsque le pool n'est pas utilisé
+        from concurrent.futures import ProcessPoolExecutor
+        self.executor = ProcessPoolExecutor(workers, initializer=init_check_worker, initargs=(io_timeout,))
+        self.expected_license = expected_license
+        self.root_dir = root_dir
+        self.environment = environment
+        self.batch_size = batch_size
+        # Nombre maximal de lots en attente : le parcours ralentit si le pool ne suit pas
+        self.max_pending = workers * 4
+        self.batch = []
+        self.futures = []
+        self.collected = 0
+        self.bytes_read = 0
+        # Un emplacement par fichier vérifié : liste d'erreurs, ou (lot, position) si le fichier est dans le pool
+        self.slots = []
+        self.emitted = 0  # emplacements déjà rendus
+        self.batches = {}  # erreurs des lots terminés, par numéro de lot
+
+    def process(self, file_path, file_name):
+        kind = file_check_kind(file_path, file_name, self.root_dir)
+        if kind in CONTENT_CHECKS:
+            self.slots.append((len(self.futures), len(self.batch)))
+            self.batch.append((kind, file_path))
+            if len(self.batch) >= self.batch_size:
+                self._submit()
+        elif kind is not None:
+            self.slots.append(run_file_check(kind, file_path, self.expected_license, self.root_dir, self.environment))
+
+    def _submit(self):
+        self.futures.append(self.executor.submit(check_file_batch, self.batch, self.expected_license,
+                                                 self.root_dir, self.environment))
+        self.batch = []
+        while len(self.futures) - self.collected > self.max_pending:
+            self.futures[self.collected].result()
+            self.collected += 1
+
+    def _batch_errors(self, batch_index, wait):
+        """ Erreurs d'un lot, ou None s'il n'est pas encore soumis ou (sans wait) pas encore terminé. """
+        if batch_index not in self.batches:
+            if batch_index >= len(self.futures):
+                return None
+            future = self.futures[batch_index]
+            if not wait and not future.done():
+                return None
+            batch_errors, bytes_read = future.result()
+            self.batches[batch_index] = batch_errors
+            self.bytes_read += bytes_read
+        return self.batches[batch_index]
+
+    def take_results(self, wait=False):
+        """ Erreurs des fichiers pas encore rendus, dans l'ordre du parcours.
+
+        Sans wait, s'arrête au premier fichier dont le lot n'est pas terminé : le parcours n'est jamais bloqué.
+        """
+        errors = []
+        while self.emitted < len(self.slots):
+            slot = self.slots[self.emitted]
+            if isinstance(slot, tuple):
+                batch_index, position = slot
+                batch_errors = self._batch_errors(batch_index, wait)
+                if batch_errors is None:
+                    break
+                errors.extend(batch_errors[position])
+            else:
+                errors.extend(slot)
+            self.emitted += 1
+        return errors
+
+    def results(self):
+        """ Attend la fin des lots et renvoie les erreurs pas encore rendues, dans l'ordre du parcours. """
+        if self.batch:
+            self._submit()
+        try:
+            return self.take_results(wait=True)
+        finally:
+            self.executor.shutdown()
+
+def full_check(root_dir, expected_license, environment, matcher, selection=ALL_PROJECTS, fs=LOCAL_FS, pipeline=None,
+               report=None):
+    """ Analyse complète en un seul parcours, projet par projet dans l'ordre de la sélection.
+
+    Chaque dossier est vérifié dès qu'il est listé : dossiers interdits (sauf en DEV), index DebuggerSave / Version.txt
+    et fichiers, sauf ceux des dossiers interdits et de leurs sous-dossiers. Les fichiers ifs.ini et start.xml sont
+    confiés au pipeline s'il est fourni.
+
+    Les erreurs sont signalées par report(erreur) à la fin de chaque projet (dossiers interdits, Version.txt, puis
+    fichiers), celles du pipeline dès que leur lot est terminé. Sans report, elles sont renvoyées dans une liste.
+    """
+    found = []
+    report = report or found.append
+    forbidden_errors, file_errors = [], []
+    index = DirectoryIndex(root_dir, selection)
+    project = None  # dossier de premier niveau en cours de parcours (None pour la racine)
+    root_prefix = os.path.join(root_dir, "")
+    reported_debugger_dirs = 0  # dossiers DebuggerSave de l'index déjà vérifiés
+    # Sous-dossiers des dossiers interdits encore à parcourir : leurs fichiers ne sont pas vérifiés
+    excluded = set()
+
+    def prefetch(dirpath, file_name):
+        if file_check_kind(os.path.join(dirpath, file_name), file_name, root_dir) not in CONTENT_CHECKS:
+            return False
+        # Les fichiers des dossiers interdits (et de leurs sous-dossiers) ne sont pas vérifiés : pas de lecture d'avance
+        relative_dir = os.path.relpath(dirpath, root_dir)
+        return relative_dir == "." or not any(matcher.match(part) for part in relative_dir.split(os.sep))
+
+    def report_project():
+        nonlocal reported_debugger_dirs
+        errors = forbidden_errors + check_version_files(index, reported_debugger_dirs) + file_errors
+        reported_debugger_dirs = len(index.debugger_dirs)
+        forbidden_errors.clear()
+        file_errors.clear()
+        if pipeline:
+            errors.extend(pipeline.take_results())
+        for error in errors:
+            report(error)
+
+    # Sans pool, les fichiers à analyser sont lus d'avance par le parcours
+    for dirpath, dirnames, filenames in walk_tree(root_dir, selection, fs, prefetch=None if pipeline else prefetch):
+        # Le parcours est en profondeur : un projet est terminé dès qu'un dossier d'un autre projet arrive
+        dir_project = None if dirpath == root_dir else dirpath[len(root_prefix):].split(os.sep, 1)[0]
+        if dir_project != project:
+            report_project()
+            project = dir_project
+        log_message(f"Scan du dossier : {dirpath}", level="INFO")
+        index.record(dirpath, dirnames, filenames)
+        in_forbidden = dirpath in excluded
+        excluded.discard(dirpath)
+        for dir_name in dirnames:
+            if not matcher.match(dir_name):
+                if in_forbidden:
+                    excluded.add(os.path.join(dirpath, dir_name))
+                continue
+            forbidden_dir_path = os.path.join(dirpath, dir_name)
+            excluded.add(forbidden_dir_path)
+            if environment != "DEV":
+                forbidden_errors.append(make_finding("forbidden_folder", "WARNING", forbidden_dir_path,
+                                                     f"Veuillez vérifier ce dossier {forbidden_dir_path}"))
+            if not in_forbidden:
+                log_message(f"Dossier ignoré car interdit: {forbidden_dir_path}", level="INFO")
+        if in_forbidden:
+            continue
+        for file_name in filenames:
+            file_path = os.path.join(dirpath, file_name)
+            if pipeline:
+                pipeline.process(file_path, file_name)
+            else:
+                file_errors.extend(process_file(file_path, file_name, expected_license, root_dir, environment, fs))
+    report_project()
+    if pipeline:
+        for error in pipeline.results():
+            report(error)
+    return found
+
+# Vérifications non effectuées par le mode rapide
+QUICK_SKIPPED_CHECKS = [
+    "dossiers interdits (Temp, CleanBackUp, DebuggerSave, ...) dans toute l'arborescence",
+    "fichiers start.xml situés sous le premier niveau des projets",
+    "fichiers Version.txt des dossiers DebuggerSave situés sous le premier niveau des projets",
+    "dossiers inaccessibles sous le premier niveau des projets",
+]
+
+def quick_check(root_dir, expected_license, environment, matcher, selection=ALL_PROJECTS, fs=LOCAL_FS):
+    """ Mode rapide : vérifie seulement la racine et le premier niveau des projets, sans parcours récursif.
+
+    Couvre le ifs.ini de la racine, les .suo des projets, les start.xml et les Version.txt à côté de DebuggerSave.
+    """
+    errors = []
+    index = DirectoryIndex(root_dir, selection)
+    def descend(dirpath, dir_name):
+        # Seuls les dossiers de premier niveau autorisés sont listés
+        return dirpath == root_dir and not matcher.match(dir_name)
+
+    for dirpath, dirnames, filenames in walk_tree(root_dir, selection, fs, descend):
+        index.record(dirpath, dirnames, filenames)
+        for file_name in filenames:
+            file_path = os.path.join(dirpath, file_name)
+            errors.extend(process_file(file_path, file_name, expected_license, root_dir, environment, fs))
+    errors.extend(check_version_files(index))
+    return errors
+
+def collect_projects(root_dir, matcher, selection=ALL_PROJECTS, fs=LOCAL_FS):
+    """ Inventaire des projets PWC_ des dossiers Projects de MagicDev, MagicPrd et MagicPPrd : (inventaire, erreurs). """
+    errors = []
+    inventory = {env_key: set() for env_key in MAGIC_FOLDERS}
+
+    # Vérification des projets dans les environnements spécifiés
+    for env_key, env_value in MAGIC_FOLDERS.items():
+        magic_dir = os.path.join(root_dir, env_value, "Projects")
+        if fs.exists(magic_dir):
+            log_message(f"Scan du dossier {magic_dir}", level="INFO")
+            for dirpath, dirnames, _ in walk_tree(magic_dir, selection, fs):
+                for dir_name in dirnames:
+                    # Ignorer les éléments qui ne sont pas des projets
+                    if not matcher.match(dir_name) and dir_name.startswith("PWC_"):
+                        # Ajout du projet uniquement s'il commence par PWC_
+                        inventory[env_key].add(dir_name)
+
+        elif magic_dir not in fs.unreachable:
+            errors.append(make_finding("projects_folder", "ERROR", magic_dir, f"Le dossier 'Projects' est manquant dans {magic_dir}."))
+
+    return inventory, errors
+
+def compare_projects(inventory, root_dir, environment):
+    """ Vérifie à partir de l'inventaire que les projets de PROD sont présents en PREPROD et en DEV. """
+    errors = []
+    prod_projects = inventory["PROD"]
+    preprod_projects = inventory["PREPROD"]
+    dev_projects = inventory["DEV"]
+
+    # Affichage des projets trouvés en PROD, PREPROD et DEV
+    log_message(f"Projets trouvés en PROD: {', '.join(prod_projects)}", level="INFO")
+    log_message(f"Projets trouvés en PREPROD: {', '.join(preprod_projects)}", level="INFO")
+    log_message(f"Projets trouvés en DEV: {', '.join(dev_projects)}", level="INFO")
+
+    # Vérification que les projets en PROD sont également présents en DEV et PREPROD
+    missing_in_preprod = prod_projects - preprod_projects
+    missing_in_dev = prod_projects - dev_projects
+
+    if environment == "PREPROD":
+        if missing_in_dev:
+            errors.append(make_finding("projects_missing", "WARNING", root_dir,
+                                       f"Projets en PrePROD manquants en DEV: {', '.join(missing_in_dev)}",
+                                       "DEV", *sorted(missing_in_dev)))
+    else:
+        if missing_in_preprod:
+            errors.append(make_finding("projects_missing", "WARNING", root_dir,
+                                       f"Projets en PROD manquants en PREPROD: {', '.join(missing_in_preprod)}",
+                                       "PREPROD", *sorted(missing_in_preprod)))
+        
+        if missing_in_dev:
+            errors.append(make_finding("projects_missing", "WARNING", root_dir,
+                                       f"Projets en PROD manquants en DEV: {', '.join(missing_in_dev)}",
+                                       "DEV", *sorted(missing_in_dev)))
+
+    return errors
+
+# ------------------------------
+# SAUVEGARDE DES RÉSULTATS
+# ------------------------------
+def save_results_to_file(results):
+    """ Sauvegarde les résultats dans un fichier, regroupés : dossiers interdits, Version.txt, puis les autres. """
+    try:
+        with open(RESULTS_FILE, "w", encoding="utf-8", errors="ignore") as result_file:
+            timestamp = datetime.now().strftime("%Y-%m-%d;%H:%M:%S.") + f"{datetime.now().microsecond // 1000:03d}"
+            result_file.write(f"{timestamp};0;INFO;Résultats de l'analyse:\n")
+            # Tri stable : chaque groupe garde l'ordre du parcours
+            for finding in sorted(results, key=lambda finding: RESULT_GROUP_ORDER.get(finding.check, len(RESULT_GROUP_ORDER))):
+                result_file.write(f"{timestamp};0;WARNING;{finding.message}\n")
+        log_message(f"Résultats sauvegardés dans {RESULTS_FILE}", level="SUCCESS")
+    except Exception as e:
+        log_message(f"Erreur lors de la sauvegarde des résultats : {e}", level="WARNING")
+
+def partial_results_file(shard):
+    """ Chemin du fichier de résultats partiels d'un shard. """
+    index, count = shard
+    return os.path.join(RESULTS_DIR, f"Checks_Results_shard_{index}_of_{count}.json")
+
+def save_partial_results(partial_file, environment, root_dir, shard, findings, inventory=None):
+    """ Sauvegarde les résultats bruts d'un shard (et l'inventaire des projets) pour une fusion ultérieure.
+
+    Les chemins sont relatifs au dossier analysé : les shards peuvent monter l'arborescence à des chemins différents.
+    """
+    partial = {
+        "environment": environment,
+        "folder": root_dir,
+        "shard": list(shard),
+        "findings": [dict(finding._asdict(), path=relative_finding_path(finding.path, root_dir)) for finding in findings],
+        "inventory": {env_key: sorted(projects) for env_key, projects in inventory.items()} if inventory is not None else None,
+    }
+    try:
+        with open(partial_file, "w", encoding="utf-8") as file:
+            json.dump(partial, file, ensure_ascii=False, indent=1)
+        log_message(f"Résultats partiels du shard {shard[0]}/{shard[1]} sauvegardés dans {partial_file}", level="SUCCESS")
+    except Exception as e:
+        log_message(f"Erreur lors de la sauvegarde des résultats partiels : {e}", level="WARNING")
+
+def merge_partial_results(partial_files, environment, root_dir=None):
+    """ Fusionne les résultats partiels des shards : (dossier, résultats dédoublonnés, inventaire ou None).
+
+    Les chemins relatifs des résultats sont rattachés à root_dir (par défaut le dossier du premier shard).
+    """
+    partials = []
+    for partial_file in partial_files:
+        with open(partial_file, "r", encoding="utf-8") as file:
+            partials.append(json.load(file))
+    partials.sort(key=lambda partial: partial["shard"][0])
+
+    root_dir = root_dir or partials[0]["folder"]
+    shard_count = partials[0]["shard"][1]
+    for partial in partials:
+        if partial["environment"] != environment or partial["shard"][1] != shard_count:
+            raise ValueError(f"Shard {partial['shard'][0]}/{partial['shard'][1]} ({partial['environment']}) "
+                             f"incompatible avec {environment} en {shard_count} shards.")
+    missing_shards = set(range(1, shard_count + 1)) - {partial["shard"][0] for partial in partials}
+    if missing_shards:
+        log_message(f"Shards manquants dans la fusion : {', '.join(map(str, sorted(missing_shards)))}", level="WARNING")
+
+    findings, seen = [], set()
+    for partial in partials:
+        for data in partial["findings"]:
+            path = os.path.normpath(os.path.join(root_dir, data["path"])) if data["path"] else ""
+            finding = Finding(data["check"], data["level"], path, tuple(data["values"]), data["message"])
+            fingerprint = finding_fingerprint(finding, root_dir)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                findings.append(finding)
+
+    inventory = None
+    if all(partial["inventory"] is not None for partial in partials):
+        inventory = {env_key: set() for env_key in MAGIC_FOLDERS}
+        for partial in partials:
+            for env_key, projects in partial["inventory"].items():
+                inventory[env_key].update(projects)
+    return root_dir, findings, inventory
+
+def estimate_totals(findings, root_dir, fraction, sampled_dirs):
+    """ Extrapole le nombre de résultats par vérification à l'ensemble des projets à partir d'un échantillon. """
+    estimates = {}
+    for finding in findings:
+        # Seuls les résultats des dossiers de premier niveau échantillonnés sont extrapolés
+        # (les fichiers de la racine sont toujours analysés)
+        top_level = relative_finding_path(finding.path, root_dir).split("/")[0]
+        weight = 1 / fraction if top_level in sampled_dirs else 1
+        estimates[finding.check] = estimates.get(finding.check, 0) + weight
+    return {check: round(count) for check, count in estimates.items()}
+
+def parse_sample(value):
+    """ Convertit la fraction d'échantillonnage (0 < fraction <= 1). """
+    try:
+        fraction = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fraction invalide '{value}'.")
+    if not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError(f"Fraction invalide '{value}' : il faut 0 < fraction <= 1.")
+    return fraction
+
+def parse_shard(value):
+    """ Convertit "i/N" en (i, N) avec 1 <= i <= N. """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Shard invalide '{value}', format attendu : i/N (ex: 1/4).")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Shard invalide '{value}' : il faut 1 <= i <= N.")
+    return index, count
+
+# ------------------------------
+# MÉTRIQUES
+# ------------------------------
+def format_metric_labels(labels):
+    """ Étiquettes au format Prometheus : {nom="valeur",...}. """
+    if not labels:
+        return ""
+    escaped = []
+    for name, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+def default_metrics_file(environment, mode, shard=None):
+    """ Fichier de métriques propre à l'environnement et au mode (et au shard) : une analyse n'écrase pas les autres. """
+    suffix = f"_{shard[0]}_of_{shard[1]}" if shard else ""
+    return os.path.join(RESULTS_DIR, f"CheckScript_{environment}_{mode}{suffix}.prom")
+
+def save_metrics(metrics_file, environment, mode, duration, fs, findings, suppressed, bytes_read_by_workers=0,
+                 estimates=None, shard=None):
+    """ Écrit les métriques de l'analyse au format textfile de node_exporter.
+
+    Le fichier est écrit à côté puis renommé (os.replace) : une collecte ne voit jamais un fichier partiel.
+    """
+    base = {"environment": environment, "mode": mode}
+    if shard:
+        base["shard"] = f"{shard[0]}/{shard[1]}"
+    by_check = {}
+    for finding in findings:
+        key = (finding.check, finding.level)
+        by_check[key] = by_check.get(key, 0) + 1
+
+    metrics = [
+        ("checkscript_scan_duration_seconds", "Durée de la dernière analyse.", [(base, round(duration, 3))]),
+        ("checkscript_directories_visited", "Dossiers distincts listés pendant la dernière analyse.", [(base, len(fs.visited_dirs))]),
+        ("checkscript_files_visited", "Fichiers distincts rencontrés dans les dossiers listés.", [(base, fs.files_visited)]),
+        ("checkscript_bytes_read", "Octets lus dans les fichiers vérifiés.", [(base, fs.bytes_read + bytes_read_by_workers)]),
+        ("checkscript_findings", "Résultats signalés par vérification et sévérité.",
+         [(dict(base, check=check, severity=level), count) for (check, level), count in sorted(by_check.items())]),
+        ("checkscript_findings_suppressed", "Résultats ignorés car présents dans la baseline.", [(base, suppressed)]),
+        ("checkscript_unreachable_paths", "Chemins abandonnés après le délai maximal d'E/S.", [(base, len(fs.unreachable))]),
+        ("checkscript_findings_estimated", "Résultats extrapolés à l'ensemble des projets (analyse par échantillon).",
+         [(dict(base, check=check), count) for check, count in sorted((estimates or {}).items())]),
+        ("checkscript_last_success_timestamp_seconds", "Horodatage de la dernière analyse terminée.", [(base, int(time.time()))]),
+    ]
+    lines = []
+    for name, help_text, samples in metrics:
+        if not samples and name == "checkscript_findings_estimated":
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{format_metric_labels(labels)} {value}")
+
+    temporary_file = f"{metrics_file}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_file, "w", encoding="utf-8", newline="\n") as file:
+            file.write("\n".join(lines) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_file, metrics_file)
+        log_message(f"Métriques sauvegardées dans {metrics_file}", level="SUCCESS")
+    except Exception as e:
+        log_message(f"Erreur lors de la sauvegarde des métriques : {e}", level="WARNING")
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+
+# ------------------------------
+# POINT D'ENTRÉE PRINCIPAL
+# ------------------------------
+if __name__ == "__main__":
+    start_time = time.monotonic()
+    parser = argparse.ArgumentParser(description="Vérification des fichiers d'un projet.")
+    parser.add_argument("environment", choices=["PROD", "PREPROD", "DEV"], help="Environnement à analyser.")
+    parser.add_argument("--folder", help="Chemin du dossier à analyser (avec --merge : dossier auquel rattacher les résultats).")
+    parser.add_argument("--check-projects", action="store_true", help="Vérifier si les projets PROD sont présents en DEV et PREPROD.")
+    parser.add_argument("--forbidden-rules", default=FORBIDDEN_RULES_FILE, help="Fichier JSON des règles de dossiers interdits.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Fichier des résultats acceptés à ne plus signaler.")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Remplacer dans la baseline les résultats de la famille de vérifications analysée.")
+    parser.add_argument("--shard", type=parse_shard, help="Analyser uniquement le shard i/N des projets et écrire des résultats partiels.")
+    parser.add_argument("--merge", nargs="+", metavar="PARTIEL", help="Fusionner les résultats partiels des shards dans le fichier de résultats.")
+    parser.add_argument("--io-timeout", type=float, default=IO_TIMEOUT,
+                        help="Délai maximal (secondes) par lecture de dossier ou de fichier, 0 pour désactiver.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Mode rapide : vérifier uniquement la racine et le premier niveau des projets, sans parcours récursif.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de processus pour l'analyse des fichiers ifs.ini et start.xml (1 = sans pool).")
+    parser.add_argument("--prioritize", choices=["recent"],
+                        help="Analyser d'abord les projets PWC_ dont le dossier a été modifié le plus récemment.")
+    parser.add_argument("--sample", type=parse_sample, metavar="FRACTION",
+                        help="Analyser un échantillon reproductible des projets (ex: 0.1) et extrapoler les totaux.")
+    parser.add_argument("--sample-seed", type=int, default=0, help="Graine de l'échantillon (--sample).")
+    parser.add_argument("--metrics-file",
+                        help="Fichier de métriques au format textfile de node_exporter (Prometheus) "
+                             "(défaut : resultats/CheckScript_<environnement>_<mode>.prom).")
+    args = parser.parse_args()
+    prepare_output_files()
+    if not args.folder and not args.merge:
+        parser.error("--folder est obligatoire (sauf avec --merge).")
+    if args.shard and (args.merge or args.update_baseline):
+        parser.error("--shard ne peut pas être combiné avec --merge ou --update-baseline.")
+    if args.update_baseline and (args.quick or args.sample):
+        parser.error("--update-baseline ne peut pas être combiné avec --quick ou --sample (analyse partielle).")
+    if args.quick and (args.merge or args.check_projects):
+        parser.error("--quick ne peut pas être combiné avec --merge ou --check-projects.")
+    if args.merge and (args.sample or args.prioritize):
+        parser.error("--sample et --prioritize ne peuvent pas être combinés avec --merge.")
+
+    forbidden_matcher = load_forbidden_matcher(args.environment, args.forbidden_rules)
+    # La baseline est appliquée à la fusion, pas dans les résultats partiels des shards
+    baseline = frozenset() if args.update_baseline or args.shard else load_baseline(args.baseline)
+    fs = TimedFileSystem(args.io_timeout) if args.io_timeout > 0 else LOCAL_FS
+    selection = ProjectSelection(args.shard, args.sample, args.sample_seed, args.prioritize)
+    inventory = None
+    worker_bytes_read = 0
+
+    if args.merge:
+        try:
+            root_dir, findings, inventory = merge_partial_results(args.merge, args.environment, args.folder)
+        except Exception as e:
+            log_message(f"Erreur lors de la fusion des résultats partiels : {e}", level="ERROR")
+            raise SystemExit(1)
+        results = ResultCollector(root_dir, baseline)
+        results.extend(findings)
+        if inventory is not None:
+            results.extend(compare_projects(inventory, root_dir, args.environment))
+    elif args.check_projects:
+        root_dir = args.folder
+        results = ResultCollector(root_dir, baseline)
+        # Vérification des projets dans les environnements
+        inventory, findings = collect_projects(root_dir, forbidden_matcher, selection, fs)
+        results.extend(findings)
+        # En shard, la comparaison est faite à la fusion, sur les inventaires de tous les shards
+        if not args.shard:
+            results.extend(compare_projects(inventory, root_dir, args.environment))
+    else:
+        root_dir = args.folder
+        results = ResultCollector(root_dir, baseline)
+        # Autres vérifications normales
+        license_map = {
+            "PROD": "LicenseName=IBPRSRVI",
+            "PREPROD": "LicenseName=IBPRSRVI",
+            "DEV": "LicenseName=IBNPSRV"
+        }
+        expected_license = license_map.get(args.environment)
+
+        if args.quick:
+            results.extend(quick_check(root_dir, expected_license, args.environment, forbidden_matcher, selection, fs))
+            for skipped_check in QUICK_SKIPPED_CHECKS:
+                log_message(f"Mode rapide, vérification non effectuée : {skipped_check}", level="INFO")
+        else:
+            pipeline = None
+            if args.workers > 1:
+                pipeline = ContentCheckPipeline(args.workers, expected_license, root_dir, args.environment, args.io_timeout)
+            full_check(root_dir, expected_license, args.environment, forbidden_matcher, selection, fs, pipeline, results.add)
+            if pipeline:
+                worker_bytes_read = pipeline.bytes_read
+
+    results.extend(fs.unreachable_findings())
+
+    estimates = None
+    if args.sample and not args.check_projects and selection.sampled_fraction(root_dir):
+        fraction = selection.sampled_fraction(root_dir)
+        estimates = estimate_totals(results.findings, root_dir, fraction, selection.selected_dirs(root_dir))
+        log_message(f"Échantillon de {fraction:.1%} des projets : {len(results.findings)} résultat(s), "
+                    f"estimation sur l'ensemble : {sum(estimates.values())}", level="INFO")
+        for check, count in sorted(estimates.items()):
+            log_message(f"Estimation sur l'ensemble des projets, {check} : {count}", level="INFO")
+
+    if args.shard:
+        save_partial_results(partial_results_file(args.shard), args.environment, root_dir, args.shard,
+                             results.findings, inventory)
+    else:
+        if args.update_baseline:
+            save_baseline(results.findings, root_dir, args.baseline, project_checks=inventory is not None)
+        if results.suppressed:
+            log_message(f"{results.suppressed} résultat(s) ignoré(s) car présent(s) dans la baseline.", level="INFO")
+        if results.findings:
+            save_results_to_file(results.findings)
+        elif args.check_projects or inventory is not None:
+            log_message("Aucune erreur trouvée concernant les projets.", level="SUCCESS")
+        else:
+            log_message("Aucune erreur trouvée.", level="SUCCESS")
+
+    mode = ("merge" if args.merge else "shard" if args.shard else "sample" if args.sample
+            else "check_projects" if args.check_projects else "quick" if args.quick else "full")
+    metrics_file = args.metrics_file or default_metrics_file(args.environment, mode, args.shard)
+    save_metrics(metrics_file, args.environment, mode, time.monotonic() - start_time, fs,
+                 results.findings, results.suppressed, worker_bytes_read, estimates, args.shard)